@@ -1,79 +1,140 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+import csv
 import joblib
 from datetime import datetime
-import matplotlib.pyplot as plt
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+from sklearn.pipeline import make_pipeline
 
 
 # ---------------- Load Comments ----------------
+COMMENT_FIELDS = ["comment", "username", "timestamp", "profile_color", "avatar", "is_toxic"]
+
+# Repeated values (usernames, colours, avatars) are stored as categories
+COMMENT_DTYPES = {
+    "comment": "string",
+    "username": "category",
+    "profile_color": "category",
+    "avatar": "category",
+    "is_toxic": "boolean"
+}
+
+
 def load_comments_data(filename="submitted_comments.csv"):
+    if not os.path.exists(filename):
+        st.warning("No comments data found.")
+        return pd.DataFrame(columns=COMMENT_FIELDS)
+
+    # The mtime is part of the cache key, so reruns reuse the parsed frame
+    # until the CSV is written again. Errors are handled out here so a
+    # failed read (e.g. mid-append) isn't cached as an empty frame.
     try:
-        if not os.path.exists(filename):
-            st.warning("No comments data found.")
-            return pd.DataFrame(columns=["comment", "username", "timestamp", "profile_color", "avatar", "is_toxic"])
+        return _load_comments_data(filename, os.path.getmtime(filename))
+    except Exception as e:
+        st.error(f"Error loading comments: {e}")
+        return pd.DataFrame(columns=COMMENT_FIELDS)
 
-        df = pd.read_csv(filename)
 
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        else:
-            df['timestamp'] = pd.NaT
+# Only the latest mtime is ever requested again, so older frames are evicted
+@st.cache_data(max_entries=1)
+def _load_comments_data(filename, mtime):
+    df = pd.read_csv(filename, dtype=COMMENT_DTYPES)
 
-        if 'is_toxic' not in df.columns or df['is_toxic'].isna().any():
-            df['is_toxic'] = df['comment'].apply(detect_toxic_comments)
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    else:
+        df['timestamp'] = pd.NaT
 
-        df['is_toxic'] = df['is_toxic'].fillna(False).astype(bool)
-        return df
+    # Only rows saved without a label are scored; history keeps its label
+    if 'is_toxic' not in df.columns:
+        df['is_toxic'] = detect_toxic_comments_batch(df['comment'])
+    else:
+        mask = df['is_toxic'].isna().to_numpy()
+        if mask.any():
+            df.loc[mask, 'is_toxic'] = detect_toxic_comments_batch(df.loc[mask, 'comment'])
 
-    except Exception as e:
-        st.error(f"Error loading comments: {e}")
-        return pd.DataFrame(columns=["comment", "username", "timestamp", "profile_color", "avatar", "is_toxic"])
+    df['is_toxic'] = df['is_toxic'].astype(bool)
+    return df
 
 
-# ---------------- Detect Toxic Comments ----------------
-def detect_toxic_comments(comment):
+def load_user_activity(filename="submitted_comments.csv"):
     try:
-        if pd.isna(comment) or comment == "":
-            return False
-
-        tfidf = joblib.load('tfidf_vectorizer.pkl')
-        model = joblib.load('toxic_comment_model.pkl')
-        features = tfidf.transform([comment])
-        prediction = model.predict(features)
-        return bool(prediction[0])
+        return _load_user_activity(filename, os.path.getmtime(filename))
     except Exception as e:
-        st.error(f"Error in detecting toxicity: {e}")
-        return False
+        st.error(f"Error loading user activity: {e}")
+        return pd.DataFrame(columns=['username', 'Total_Comments', 'Toxic_Comments'])
+
+
+@st.cache_data(max_entries=1)
+def _load_user_activity(filename, mtime):
+    comments_df = _load_comments_data(filename, mtime)
+    # Two hashed counts instead of a groupby with named aggregations
+    user_activity = pd.DataFrame({
+        'Total_Comments': comments_df['username'].value_counts(sort=False),
+        'Toxic_Comments': comments_df.loc[comments_df['is_toxic'], 'username'].value_counts(sort=False)
+    }).fillna(0).astype('int64')
+    user_activity.index.name = 'username'
+    return user_activity.reset_index()
+
+
+# ---------------- Load Model ----------------
+@st.cache_resource
+def _get_artifacts():
+    # Loaded once per process and shared across reruns and sessions
+    return joblib.load('tfidf_vectorizer.pkl'), joblib.load('toxic_comment_model.pkl')
+
+
+# ---------------- Detect Toxic Comments ----------------
+def detect_toxic_comments_batch(comments):
+    # One transform/predict over the whole column instead of one call per row.
+    # Errors propagate: this runs inside the cached loader, and a swallowed
+    # failure would be cached as "every row is non-toxic".
+    comments = comments.fillna('').astype(str)
+    empty = (comments == "").to_numpy()
+    if empty.all():
+        return np.zeros(len(comments), dtype=bool)
+    tfidf, model = _get_artifacts()
+    predictions = model.predict(tfidf.transform(comments.tolist())).astype(bool)
+    predictions[empty] = False
+    return predictions
 
 
 # ---------------- Save Comments ----------------
 def save_comment_to_csv(comment, username, profile_color, avatar, is_toxic, filename="submitted_comments.csv"):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_comment = pd.DataFrame([{
-        "comment": comment,
-        "username": username,
-        "timestamp": timestamp,
-        "profile_color": profile_color,
-        "avatar": avatar,
-        "is_toxic": is_toxic
-    }])
-
-    if os.path.exists(filename):
-        comments_df = pd.read_csv(filename)
-        comments_df = pd.concat([comments_df, new_comment], ignore_index=True)
-    else:
-        comments_df = new_comment
-
-    comments_df.to_csv(filename, index=False)
+    new_file = not os.path.exists(filename)
+
+    # Append a single row instead of rewriting the whole file
+    with open(filename, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COMMENT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow({
+            "comment": comment,
+            "username": username,
+            "timestamp": timestamp,
+            "profile_color": profile_color,
+            "avatar": avatar,
+            "is_toxic": is_toxic
+        })
 
 
 # ---------------- Train Model ----------------
+def confusion_counts(y_true, y_pred):
+    # Single bincount over encoded (true, pred) pairs; rows are true labels
+    labels, encoded = np.unique(np.concatenate([np.asarray(y_true), np.asarray(y_pred)]), return_inverse=True)
+    k = len(labels)
+    true_idx, pred_idx = encoded[:len(y_true)], encoded[len(y_true):]
+    counts = np.bincount(true_idx * k + pred_idx, minlength=k * k).reshape(k, k)
+    return labels, counts
+
+
 def train_model(dataset_path):
     data = pd.read_csv(dataset_path)
 
@@ -89,7 +150,14 @@ def train_model(dataset_path):
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y)
 
-    tfidf = TfidfVectorizer(max_features=10000, stop_words='english', ngram_range=(1, 2))
+    # Hashing keeps no vocabulary, so the saved vectorizer is just the IDF
+    # vector and loads without rebuilding a large term dictionary.
+    # float32 halves the feature matrix; LogisticRegression keeps it as-is.
+    tfidf = make_pipeline(
+        HashingVectorizer(n_features=2**17, stop_words='english', ngram_range=(1, 2),
+                          alternate_sign=False, norm=None, dtype=np.float32),
+        TfidfTransformer()
+    )
     X_train_tfidf = tfidf.fit_transform(X_train)
     X_test_tfidf = tfidf.transform(X_test)
 
@@ -101,8 +169,16 @@ def train_model(dataset_path):
     st.text("Classification Report:\n")
     st.text(classification_report(y_test, y_pred))
 
+    labels, counts = confusion_counts(y_test, y_pred)
+    st.text("Confusion Matrix:\n")
+    st.dataframe(pd.DataFrame(counts, index=labels, columns=labels))
+
     joblib.dump(model, 'toxic_comment_model.pkl')
     joblib.dump(tfidf, 'tfidf_vectorizer.pkl')
+    # Drop the cached artifacts and the frames labelled by the old model
+    _get_artifacts.clear()
+    _load_comments_data.clear()
+    _load_user_activity.clear()
     st.success("Model and vectorizer saved!")
 
 
@@ -129,23 +205,18 @@ def admin_dashboard():
 
         st.subheader('Toxicity Distribution')
         if total_comments > 0:
-            labels = ['Toxic Comments', 'Non-Toxic Comments']
-            sizes = [toxic_comments, non_toxic_comments]
-            colors = ['#ff6347', '#90ee90']
-            explode = (0.1, 0)
-
-            fig, ax = plt.subplots()
-            ax.pie(sizes, explode=explode, labels=labels, colors=colors,
-                   autopct='%1.1f%%', shadow=True, startangle=140)
-            ax.axis('equal')
-            st.pyplot(fig)
+            distribution = pd.DataFrame(
+                {'Comments': [toxic_comments, non_toxic_comments]},
+                index=['Toxic Comments', 'Non-Toxic Comments']
+            )
+            st.bar_chart(distribution)
         else:
-            st.info("No comments available to display pie chart.")
+            st.info("No comments available to display chart.")
 
         st.subheader('Recent Comments')
         if not comments_df.empty:
-            recent_comments = comments_df.sort_values(
-                'timestamp', ascending=False).head(100)
+            # Partial selection of the newest rows instead of a full sort
+            recent_comments = comments_df.nlargest(100, 'timestamp')
             st.dataframe(recent_comments)
         else:
             st.info('No comments to display.')
@@ -161,10 +232,7 @@ def admin_dashboard():
 
     elif page == 'User Management':
         if not comments_df.empty:
-            user_activity = comments_df.groupby('username').agg(
-                Total_Comments=('comment', 'count'),
-                Toxic_Comments=('is_toxic', 'sum')
-            ).reset_index()
+            user_activity = load_user_activity()
             st.subheader('User Activity Report')
             st.dataframe(user_activity)
         else:
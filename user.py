@@ -1,86 +1,189 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import random
-import datetime
+import time
 import joblib
 import os
+import html
+import csv
+import functools
 
 
 # ================= Generate Random User ================= #
+USERNAMES = (
+    "Tech Enthusiast", "Code Ninja", "Digital Explorer",
+    "Cyber Wizard", "Data Detective", "Innovation Guru",
+    "Tech Maverick", "Pixel Pioneer", "Coding Champion"
+)
+
+
 def generate_user_profile():
-    usernames = [
-        "Tech Enthusiast", "Code Ninja", "Digital Explorer",
-        "Cyber Wizard", "Data Detective", "Innovation Guru",
-        "Tech Maverick", "Pixel Pioneer", "Coding Champion"
-    ]
-    r, g, b = random.randint(100, 200), random.randint(100, 200), random.randint(100, 200)
+    # One uniform RNG draw split into three base-101 digits, so every
+    # channel stays uniform over 100-200 like randint(100, 200)
+    n = random.randrange(101 ** 3)
+    n, r = divmod(n, 101)
+    b, g = divmod(n, 101)
+    r, g, b = r + 100, g + 100, b + 100
     return {
-        'username': random.choice(usernames),
+        'username': random.choice(USERNAMES),
         'profile_color': f'rgb({r},{g},{b})',
-        'timestamp': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S")
     }
 
 
 # ================= Load Model ================= #
+@st.cache_resource
+def _get_artifacts():
+    # Loaded once per process and shared across reruns and sessions
+    tfidf = joblib.load('tfidf_vectorizer.pkl')
+    model = joblib.load('toxic_comment_model.pkl')
+    # One dummy prediction so the first real submission doesn't pay for
+    # sklearn/scipy's lazy setup
+    model.predict(tfidf.transform(['warmup']))
+    return tfidf, model
+
+
 def load_model():
     try:
-        tfidf = joblib.load('tfidf_vectorizer.pkl')
-        model = joblib.load('toxic_comment_model.pkl')
-        return tfidf, model
+        return _get_artifacts()
     except Exception as e:
         st.error(f"Model not found. Error: {e}")
         st.stop()
 
 
 # ================= Predict Toxicity ================= #
+# tfidf and model are cache_resource singletons, so the key is effectively the text
+@functools.lru_cache(maxsize=4096)
 def predict_toxicity(comment, tfidf, model):
+    if not comment.strip():
+        return False
     comment_tfidf = tfidf.transform([comment])
     prediction = model.predict(comment_tfidf)[0]
-    return prediction == 1
+    return bool(prediction == 1)
 
 
 # ================= Save to CSV ================= #
-def save_comment_to_csv(comment, username, profile_color, timestamp, is_toxic, filename="submitted_comments.csv"):
-    new_comment = pd.DataFrame([{
-        "comment": comment,
-        "username": username,
-        "timestamp": timestamp,
-        "profile_color": profile_color,
-        "avatar": "",  # Optional, can be left blank
-        "is_toxic": is_toxic
-    }])
-
-    if os.path.exists(filename):
-        existing_comments = pd.read_csv(filename)
-        updated_comments = pd.concat([existing_comments, new_comment], ignore_index=True)
-    else:
-        updated_comments = new_comment
+COMMENT_FIELDS = ["comment", "username", "timestamp", "profile_color", "avatar", "is_toxic"]
+
 
-    updated_comments.to_csv(filename, index=False, encoding='utf-8')
+def save_comment_to_csv(comment, username, profile_color, timestamp, is_toxic, filename="submitted_comments.csv"):
+    new_file = not os.path.exists(filename)
+
+    # Append a single row instead of rewriting the whole file
+    with open(filename, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=COMMENT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow({
+            "comment": comment,
+            "username": username,
+            "timestamp": timestamp,
+            "profile_color": profile_color,
+            "avatar": "",  # Optional, can be left blank
+            "is_toxic": is_toxic
+        })
 
 
 # ================= Format Timestamp ================= #
-def format_timestamp(timestamp):
-    try:
-        timestamp = pd.to_datetime(timestamp)
-    except:
-        return "Unknown time"
-
-    now = datetime.datetime.now()
-    diff = now - timestamp
-
-    if diff.days > 365:
-        return f"{diff.days // 365} years ago"
-    elif diff.days > 30:
-        return f"{diff.days // 30} months ago"
-    elif diff.days > 0:
-        return f"{diff.days} days ago"
-    elif diff.seconds > 3600:
-        return f"{diff.seconds // 3600} hours ago"
-    elif diff.seconds > 60:
-        return f"{diff.seconds // 60} minutes ago"
-    else:
-        return "just now"
+def format_timestamps(timestamps):
+    # Formats the whole feed in one pass instead of one call per comment
+    timestamps = pd.to_datetime(pd.Series(timestamps, dtype=object), errors='coerce')
+    diff = pd.Timestamp.now() - timestamps
+    days = diff.dt.days.fillna(0).astype(int)
+    seconds = diff.dt.seconds.fillna(0).astype(int)
+
+    return np.select(
+        [
+            timestamps.isna().to_numpy(),
+            (days > 365).to_numpy(),
+            (days > 30).to_numpy(),
+            (days > 0).to_numpy(),
+            (seconds > 3600).to_numpy(),
+            (seconds > 60).to_numpy()
+        ],
+        [
+            "Unknown time",
+            ((days // 365).astype(str) + " years ago").to_numpy(),
+            ((days // 30).astype(str) + " months ago").to_numpy(),
+            (days.astype(str) + " days ago").to_numpy(),
+            ((seconds // 3600).astype(str) + " hours ago").to_numpy(),
+            ((seconds // 60).astype(str) + " minutes ago").to_numpy()
+        ],
+        default="just now"
+    )
+
+
+# ================= Comment Feed ================= #
+# Session feed is stored column-wise so rendering reads whole columns
+FEED_COLUMNS = ('comment', 'username', 'timestamp', 'profile_color')
+FEED_PAGE_SIZE = 50
+
+
+def add_to_feed(comment, user_profile):
+    feed = st.session_state.feed
+    feed['comment'].append(comment)
+    for column in FEED_COLUMNS[1:]:
+        feed[column].append(user_profile[column])
+
+
+# ================= Comment Template ================= #
+# Kept on single lines: a blank line would end the HTML block in markdown
+COMMENT_TEMPLATE = (
+    '<div class="comment-container">'
+    '<div class="profile-pic" style="background-color: %s;">%s</div>'
+    '<div class="comment-content">'
+    '<div class="comment-header">'
+    '<span class="username">%s</span>'
+    '<span class="timestamp">%s</span>'
+    '</div>'
+    '<div class="comment-text">%s</div>'
+    '</div>'
+    '</div>'
+)
+
+
+# Re-sent on every rerun: Streamlit drops elements a rerun doesn't emit,
+# so injecting it only once per session would lose the styling
+COMMENT_CSS = """
+<style>
+.comment-container {
+    display: flex;
+    align-items: flex-start;
+    margin-bottom: 15px;
+    padding: 10px;
+    background-color: #f8f8f8;
+    border-radius: 10px;
+}
+.profile-pic {
+    width: 40px;
+    height: 40px;
+    border-radius: 50%;
+    margin-right: 10px;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: white;
+    font-weight: bold;
+}
+.comment-content {
+    flex-grow: 1;
+}
+.comment-header {
+    display: flex;
+    align-items: center;
+    margin-bottom: 5px;
+}
+.username {
+    font-weight: bold;
+    margin-right: 10px;
+}
+.timestamp {
+    color: #606060;
+    font-size: 0.8em;
+}
+</style>
+"""
 
 
 # ================= Main App ================= #
@@ -89,52 +192,17 @@ def main():
     st.title("💬 Toxic Comment Detector")
 
     # CSS for styling
-    st.markdown("""
-    <style>
-    .comment-container {
-        display: flex;
-        align-items: flex-start;
-        margin-bottom: 15px;
-        padding: 10px;
-        background-color: #f8f8f8;
-        border-radius: 10px;
-    }
-    .profile-pic {
-        width: 40px;
-        height: 40px;
-        border-radius: 50%;
-        margin-right: 10px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-weight: bold;
-    }
-    .comment-content {
-        flex-grow: 1;
-    }
-    .comment-header {
-        display: flex;
-        align-items: center;
-        margin-bottom: 5px;
-    }
-    .username {
-        font-weight: bold;
-        margin-right: 10px;
-    }
-    .timestamp {
-        color: #606060;
-        font-size: 0.8em;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(COMMENT_CSS, unsafe_allow_html=True)
 
     # Load ML model
     tfidf, model = load_model()
 
     # Session state initialization
-    if 'submitted_comments' not in st.session_state:
-        st.session_state.submitted_comments = []
+    if 'feed' not in st.session_state:
+        st.session_state.feed = {column: [] for column in FEED_COLUMNS}
+
+    if 'feed_limit' not in st.session_state:
+        st.session_state.feed_limit = FEED_PAGE_SIZE
 
     if 'toxic_comment' not in st.session_state:
         st.session_state.toxic_comment = None
@@ -155,13 +223,7 @@ def main():
                     st.error("The edited comment is still flagged as toxic.")
                 else:
                     user_profile = generate_user_profile()
-                    comment_data = {
-                        'comment': edited_comment,
-                        'username': user_profile['username'],
-                        'timestamp': user_profile['timestamp'],
-                        'profile_color': user_profile['profile_color']
-                    }
-                    st.session_state.submitted_comments.append(comment_data)
+                    add_to_feed(edited_comment, user_profile)
 
                     save_comment_to_csv(
                         edited_comment,
@@ -177,13 +239,7 @@ def main():
         with col2:
             if st.button("Submit Anyway"):
                 user_profile = generate_user_profile()
-                comment_data = {
-                    'comment': st.session_state.toxic_comment,
-                    'username': user_profile['username'],
-                    'timestamp': user_profile['timestamp'],
-                    'profile_color': user_profile['profile_color']
-                }
-                st.session_state.submitted_comments.append(comment_data)
+                add_to_feed(st.session_state.toxic_comment, user_profile)
 
                 save_comment_to_csv(
                     st.session_state.toxic_comment,
@@ -214,13 +270,7 @@ def main():
                     st.rerun()
                 else:
                     user_profile = generate_user_profile()
-                    comment_data = {
-                        'comment': comment,
-                        'username': user_profile['username'],
-                        'timestamp': user_profile['timestamp'],
-                        'profile_color': user_profile['profile_color']
-                    }
-                    st.session_state.submitted_comments.append(comment_data)
+                    add_to_feed(comment, user_profile)
 
                     save_comment_to_csv(
                         comment,
@@ -233,28 +283,30 @@ def main():
                     st.success("✅ Comment submitted successfully!")
 
     # Display Comments Feed
-    if st.session_state.submitted_comments:
+    feed = st.session_state.feed
+    if feed['comment']:
         st.header("🗨️ Comment Feed")
-        for comment_data in reversed(st.session_state.submitted_comments):
-            comment = comment_data['comment']
-            profile = comment_data['username']
-            profile_color = comment_data['profile_color']
-            timestamp = format_timestamp(comment_data['timestamp'])
-            comment_html = f"""
-                <div class="comment-container">
-                    <div class="profile-pic" style="background-color: {profile_color};">
-                        {profile[0]}
-                    </div>
-                    <div class="comment-content">
-                        <div class="comment-header">
-                            <span class="username">{profile}</span>
-                            <span class="timestamp">{timestamp}</span>
-                        </div>
-                        <div class="comment-text">{comment}</div>
-                    </div>
-                </div>
-            """
-            st.markdown(comment_html, unsafe_allow_html=True)
+        # Only the newest feed_limit comments are rendered, newest first
+        recent = slice(-st.session_state.feed_limit, None)
+        comments = feed['comment'][recent][::-1]
+        timestamps = format_timestamps(feed['timestamp'][recent][::-1])
+        feed_html = []
+        for comment, profile, profile_color, timestamp in zip(
+                comments, feed['username'][recent][::-1], feed['profile_color'][recent][::-1], timestamps):
+            feed_html.append(COMMENT_TEMPLATE % (
+                html.escape(profile_color),
+                html.escape(profile[:1]),
+                html.escape(profile),
+                timestamp,
+                html.escape(comment).replace("\n", "<br>")
+            ))
+        # One markdown element for the whole feed instead of one per comment
+        st.markdown("".join(feed_html), unsafe_allow_html=True)
+
+        if len(feed['comment']) > len(comments):
+            if st.button("Load more"):
+                st.session_state.feed_limit += FEED_PAGE_SIZE
+                st.rerun()
 
 
 if __name__ == "__main__":